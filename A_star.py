@@ -1,8 +1,36 @@
 from typing import Any
+import contextlib
+import heapq
+import io
 import numpy as np
 import time as tm
-from utils.graph import Graph, Vertex
-from utils.priority_queue import PriorityQueue
+import warnings
+# numba is required, it compiles the A* search.
+# Install using Anaconda: conda install numba
+# Install using pip: pip install numba
+from numba import njit
+from utils.graph import Graph, Vertex, Location, INT_INF
+
+def _load_rows(filename: str, columns: int) -> np.ndarray:
+    """
+    Read a comma separated file as a 2D array of strings, one row per line.
+    '#' is not treated as a comment, so it can be part of a key.
+    An empty file gives an array with no rows instead of an error.
+
+    Args:
+        filename (str): Name of the file
+        columns (int): number of fields on each line
+
+    Returns:
+        np.ndarray: rows of the file
+    """
+    with warnings.catch_warnings():
+        # loadtxt warns about empty input, for us it is just a file without rows
+        warnings.simplefilter('ignore', UserWarning)
+        rows : np.ndarray = np.loadtxt(filename, delimiter=',', dtype=str, comments=None, ndmin=2)
+    if rows.size == 0:
+        return np.empty((0, columns), dtype=str)
+    return rows
 
 def load_location_data(graph: Graph, filename: str) -> None:
     """
@@ -12,11 +40,11 @@ def load_location_data(graph: Graph, filename: str) -> None:
     Args:
         graph (Graph): graph to be filled with data.
     """
-    with open(filename, 'r') as file:
-        for line in file:
-            v_k, x, y = line.rstrip('\n').split(',')
-            vertex : Vertex = graph.get_vertex(v_k)
-            vertex.location = (float(x), float(y))
+    rows : np.ndarray = _load_rows(filename, 3)
+    coords : list[list[float]] = rows[:, 1:].astype(np.float64).tolist()
+    for v_k, (x, y) in zip(rows[:, 0].tolist(), coords):
+        vertex : Vertex = graph.get_vertex(v_k)
+        vertex.location = Location(x, y)
 
 def build_graph_from_list(data: list) -> Graph:
     """
@@ -35,6 +63,27 @@ def build_graph_from_list(data: list) -> Graph:
     
     return graph
 
+def build_graph_from_arrays(keys: np.ndarray, ffrom: np.ndarray, to: np.ndarray, weights: np.ndarray) -> Graph:
+    """
+    Build a graph from an edge list already translated to vertex indices.
+    Vertex i of the graph gets the key keys[i], so no key lookups are needed per edge.
+
+    Args:
+        keys (np.ndarray): key of each vertex
+        ffrom (np.ndarray): index of the vertex where each edge starts
+        to (np.ndarray): index of the vertex where each edge ends
+        weights (np.ndarray): weight of each edge
+
+    Returns:
+        Graph
+    """
+    graph = Graph()
+    vertices : list[Vertex] = [graph.add_vertex(key) for key in keys.tolist()]
+    for v_1, v_2, weight in zip(ffrom.tolist(), to.tolist(), weights.tolist()):
+        vertices[v_1].add_neighbor(vertices[v_2], weight)
+    
+    return graph
+
 def load_from_file(filename : str) -> Graph:
     """
     Load data from a file to build a Graph
@@ -49,13 +98,12 @@ def load_from_file(filename : str) -> Graph:
         Graph: graph loaded with data.
     """
     
-    data : list[tuple] = []
-    with open(filename, 'r') as file: 
-        for line in file:
-            vertex1, vertex2, weight = line.rstrip('\n').split(',')
-            data.append((vertex1, vertex2, int(weight)))
+    rows : np.ndarray = _load_rows(filename, 3)
+    # Every distinct key becomes a vertex, the inverse maps each endpoint to its vertex index.
+    keys, endpoints = np.unique(rows[:, :2], return_inverse=True)
+    endpoints = endpoints.reshape(-1, 2)
     
-    return build_graph_from_list(data)
+    return build_graph_from_arrays(keys, endpoints[:, 0], endpoints[:, 1], rows[:, 2].astype(np.int64))
 
 def load_heuristic_data(graph : Graph, filename : str) -> None:
     """
@@ -65,15 +113,16 @@ def load_heuristic_data(graph : Graph, filename : str) -> None:
         graph (Graph): Graph
         filename (str): File name.
     """
-    with open(filename, 'r') as file:
-        for line in file:
-            v_k, heur = line.rstrip('\n').split(',')
-            vertex = graph.get_vertex(v_k)
-            vertex.heuristic = int(heur)
+    rows : np.ndarray = _load_rows(filename, 2)
+    for v_k, heur in zip(rows[:, 0].tolist(), rows[:, 1].astype(np.int64).tolist()):
+        vertex = graph.get_vertex(v_k)
+        vertex.heuristic = heur
 
 def get_path(graph: Graph, to: Any) -> list[Any]:
     """
-    Get the path from a certain vertex to another.
+    Get the path from the start of the last search run on the graph to a certain vertex.
+    If no search was run yet, or the graph was modified since, every vertex is its own path, as if it had no
+    predecessor.
     @Important: Impossible path not checked.
 
     Args:
@@ -83,27 +132,51 @@ def get_path(graph: Graph, to: Any) -> list[Any]:
     Returns:
         list[Any]: path
     """
-    it : Vertex = graph.get_vertex(to)
-    path : list[Any] = [it.key]
-    while it.predecessor:
-        path.append(it.predecessor.key)
-        it = it.predecessor
+    if graph.prev is None:
+        return [to]
+    
+    prev : np.ndarray = graph.prev
+    end : int = graph.get_vertex(to).index
+    # First walk counts the vertices, so the second one can fill the path in order.
+    path_len : int = 1
+    it : int = end
+    while prev[it] >= 0:
+        it = prev[it]
+        path_len += 1
+    
+    path : np.ndarray = np.empty(path_len, dtype=np.int32)
+    it = end
+    for i in range(path_len - 1, -1, -1):
+        path[i] = it
+        it = prev[it]
     
-    return path[::-1]
+    return graph.keys[path].tolist()
     
-def heuristic_value(a: Vertex, end: Vertex):
+def heuristic_values(graph: Graph, end: Vertex) -> np.ndarray:
     """
-    Choose a proper heuristic value here. For this we are doing a simple Mannhatan distance
-    Actual example: we just have pre-calculated heuristic data, so we don't need to use two vertex, I keep it this way as
-    for complex cases we would want to calculate it.
+    Choose a proper heuristic value here. Pre-calculated heuristic data (e.g. from load_heuristic_data) is used
+    when any vertex has some. Otherwise, if the end point has a location, we do a simple Mannhatan distance between
+    the locations of each vertex and the end point, computed for every vertex of the graph at once; every vertex of
+    the graph needs a location then.
 
     Args:
-        a (Vertex): Any vertex from the graph
-        b (Vertex): End point
+        graph (Graph): Graph
+        end (Vertex): End point, without one (None) the pre-calculated data is used
+
+    Raises:
+        ValueError: the Manhattan distance is needed but some vertex has no location
+
+    Returns:
+        np.ndarray: heuristic value of each vertex, indexed by Vertex.index (int64 if they are all integers)
     """
-    #loc_diff = end.location - a.location
-    #return loc_diff[0] + loc_diff[1]
-    return a.heuristic
+    heuristic = np.array([v.heuristic for v in graph])
+    if end is None or end.location is None or np.any(heuristic):
+        return heuristic.astype(np.int64 if heuristic.dtype.kind in 'iu' else np.float64)
+    missing = [v.key for v in graph if v.location is None]
+    if missing:
+        raise ValueError(f"Every vertex needs a location for the Manhattan heuristic, missing: {missing[:10]}")
+    x, y = graph.locations()
+    return np.abs(x - end.location.x) + np.abs(y - end.location.y)
 
 def dijkstras_algorithm(graph: Graph, start: Vertex, end: Vertex) -> None:
     """
@@ -113,73 +186,208 @@ def dijkstras_algorithm(graph: Graph, start: Vertex, end: Vertex) -> None:
     Args:
         graph (Graph): graph to run the Dijkstra's Algorithm
         start (Vertex): starting vertex
+        end (Vertex): vertex where the search stops, None to reach every vertex
     """
     
     # counter
     operations : int = 0
-    pq : PriorityQueue[int, Vertex] = PriorityQueue(descending = False)
-    for v in graph:
-        v.dist = np.Inf
-    
-    start.dist = 0
-    pq.build_heap([(v.dist, v) for v in graph])
-    while not pq.empty():
-        current : Vertex = pq.advance()
-        if current == end:
+    indptr, neighbors, weights = graph.freeze_lists()
+    dist : list[float] = [np.inf] * graph.total_vert
+    prev : list[int] = [-1] * graph.total_vert
+    
+    dist[start.index] = 0
+    # Entries are (dist, vertex index). Instead of decreasing keys we push a new entry and discard
+    # the stale ones when popped.
+    heap : list[tuple] = [(0, start.index)]
+    # Local aliases, so the loop does not look them up on every iteration
+    heappush, heappop = heapq.heappush, heapq.heappop
+    end_index : int = end.index if end is not None else -1
+    while heap:
+        current_dist, current = heappop(heap)
+        if current_dist > dist[current]:
+            # Stale entry, a shorter path to this vertex was already found
+            continue
+        if current == end_index:
             # We're already there
             break
-        for next in current.get_connections():
+        lo, hi = indptr[current], indptr[current + 1]
+        for next, weight in zip(neighbors[lo:hi], weights[lo:hi]):
             operations += 1
-            new_dist = current.dist + current.get_weight(next)
-            if new_dist < next.dist:
-                next.dist = new_dist
-                next.predecessor = current
-                pq.decrease_key(next, new_dist)
+            new_dist = current_dist + weight
+            if new_dist < dist[next]:
+                dist[next] = new_dist
+                prev[next] = current
+                heappush(heap, (new_dist, next))
+    
+    graph.dist = np.array(dist, dtype=np.float64)
+    graph.prev = np.array(prev, dtype=np.int32)
 
     print(operations)
 
+@njit(cache=True, inline='always')
+def _heap_push(heap_key: np.ndarray, heap_node: np.ndarray, size: int, key: float, node: int) -> tuple:
+    """
+    Pushes (key, node) into a binary min-heap stored in two parallel arrays.
+    When the arrays are full they are replaced with copies of twice the size.
+
+    Returns:
+        tuple: (heap_key, heap_node, new size of the heap)
+    """
+    if size == heap_key.shape[0]:
+        grown_key = np.empty(2 * size, dtype=heap_key.dtype)
+        grown_node = np.empty(2 * size, dtype=heap_node.dtype)
+        grown_key[:size] = heap_key
+        grown_node[:size] = heap_node
+        heap_key, heap_node = grown_key, grown_node
+    pos = size
+    while pos > 0:
+        parent = (pos - 1) // 2
+        if heap_key[parent] <= key:
+            break
+        heap_key[pos] = heap_key[parent]
+        heap_node[pos] = heap_node[parent]
+        pos = parent
+    heap_key[pos] = key
+    heap_node[pos] = node
+    return heap_key, heap_node, size + 1
+
+@njit(cache=True)
+def _heap_pop(heap_key: np.ndarray, heap_node: np.ndarray, size: int) -> tuple:
+    """
+    Removes the minimum of a binary min-heap stored in two parallel arrays.
+
+    Returns:
+        tuple: (key, node, new size of the heap)
+    """
+    key = heap_key[0]
+    node = heap_node[0]
+    size -= 1
+    last_key = heap_key[size]
+    last_node = heap_node[size]
+    pos = 0
+    while 2 * pos + 1 < size:
+        child = 2 * pos + 1
+        if child + 1 < size and heap_key[child + 1] < heap_key[child]:
+            child += 1
+        if last_key <= heap_key[child]:
+            break
+        heap_key[pos] = heap_key[child]
+        heap_node[pos] = heap_node[child]
+        pos = child
+    heap_key[pos] = last_key
+    heap_node[pos] = last_node
+    return key, node, size
+
+@njit(cache=True)
+def _relax_all(current: int, dist: np.ndarray, prev: np.ndarray, heuristic: np.ndarray, indptr: np.ndarray,
+               neighbors: np.ndarray, weights: np.ndarray, heap_key: np.ndarray, heap_node: np.ndarray,
+               size: int) -> tuple:
+    """
+    Relaxes every edge leaving current in a single pass: computes g and f, updates dist and prev, and pushes
+    the improved vertices to the heap.
+
+    Returns:
+        tuple: (heap_key, heap_node, new size of the heap, number of edges relaxed)
+    """
+    current_dist = dist[current]
+    lo = indptr[current]
+    hi = indptr[current + 1]
+    for e in range(lo, hi):
+        next = neighbors[e]
+        # Calculate g:
+        new_dist = current_dist + weights[e]
+        if new_dist < dist[next]:
+            dist[next] = new_dist
+            prev[next] = current
+            # Calculate f for the priority queue:
+            heap_key, heap_node, size = _heap_push(heap_key, heap_node, size, new_dist + heuristic[next], next)
+    
+    return heap_key, heap_node, size, hi - lo
+
+@njit(cache=True)
+def _astar_csr(indptr: np.ndarray, neighbors: np.ndarray, weights: np.ndarray, heuristic: np.ndarray,
+               dist: np.ndarray, start: int, end: int) -> tuple:
+    """
+    A* over a graph in CSR form (see Graph.freeze), compiled with numba.
+    weights, heuristic and dist share their dtype (int32 or float64), dist comes filled with "infinity"
+    and it is updated in place; numba compiles a version of this function for each dtype.
+
+    Returns:
+        tuple: (prev, operations), prev is -1 for vertices without predecessor.
+    """
+    n = indptr.shape[0] - 1
+    prev = np.full(n, -1, dtype=np.int32)
+    # Lazy deletion: every improvement pushes a new entry. With a consistent heuristic every vertex is expanded
+    # at most once, so E + 1 entries are enough; otherwise vertices are expanded again and the heap grows.
+    heap_key = np.empty(neighbors.shape[0] + 1, dtype=dist.dtype)
+    heap_node = np.empty(neighbors.shape[0] + 1, dtype=np.int32)
+    operations = 0
+    
+    dist[start] = 0
+    heap_key, heap_node, size = _heap_push(heap_key, heap_node, 0, heuristic[start], start)
+    while size > 0:
+        f, current, size = _heap_pop(heap_key, heap_node, size)
+        if f > dist[current] + heuristic[current]:
+            # Stale entry
+            continue
+        if current == end:
+            # We're already there
+            break
+        heap_key, heap_node, size, relaxed = _relax_all(current, dist, prev, heuristic, indptr, neighbors, weights,
+                                                        heap_key, heap_node, size)
+        operations += relaxed
+    
+    return prev, operations
+
+def _fits_int32(weights: np.ndarray, heuristic: np.ndarray) -> bool:
+    """
+    Whether A* can keep its distances in int32: no simple path uses more than V - 1 edges, so every
+    distance plus heuristic it computes stays below max|weight| * (V - 1) + max|heuristic|.
+
+    Returns:
+        bool: True if that bound is below INT_INF
+    """
+    # Python ints, so the bound itself cannot overflow
+    max_weight : int = int(np.abs(weights).max(initial=0))
+    max_heuristic : int = int(np.abs(heuristic).max(initial=0))
+    return max_weight * max(heuristic.shape[0] - 1, 0) + max_heuristic < INT_INF
+
 def a_star_algorithm(graph: Graph, start: Vertex, end: Vertex) -> None:
     """
     A* Star Algorithm
+    The search itself runs compiled over the CSR form of the graph, results are left in graph.dist and graph.prev.
 
     Args:
         graph (Graph): graph to run the A* Algorithm
         start (Vertex): starting vertex
+        end (Vertex): vertex where the search stops, None to reach every vertex
     """
     
-    # counter
-    operations : int = 0
-    pq : PriorityQueue[int, Vertex] = PriorityQueue(descending = False)
-    for v in graph:
-        v.dist = np.Inf
-    
-    start.dist = 0
-    # this will know which nodes were already added to the queue.
-    visited : dict[Vertex, bool] = {start: True}
-    pq.insert((start.dist, start))
-    while not pq.empty():
-        current : Vertex = pq.advance()
-        if current == end:
-            # We're already there
-            break
-        for next in current.get_connections():
-            operations += 1
-            # Calculate g:
-            new_dist = current.dist + current.get_weight(next)
-            # Calculate f for the priority queue:
-            f = new_dist + heuristic_value(next, end)
-            if new_dist < next.dist:
-                next.dist = new_dist
-                next.predecessor = current
-                if next in visited:
-                    pq.decrease_key(next, f)
-                else:
-                    pq.insert((f, next))
-                    visited[next] = True
+    indptr, neighbors, weights = graph.freeze()
+    heuristic = heuristic_values(graph, end)
+    if weights.dtype.kind == 'i' and heuristic.dtype.kind == 'i' and _fits_int32(weights, heuristic):
+        # Everything fits in int32: half the memory of float64 and cheaper comparisons
+        weights = weights.astype(np.int32, copy=False)
+        heuristic = heuristic.astype(np.int32)
+        dist = np.full(graph.total_vert, INT_INF, dtype=np.int32)
+    else:
+        weights = weights.astype(np.float64, copy=False)
+        heuristic = heuristic.astype(np.float64, copy=False)
+        dist = np.full(graph.total_vert, np.inf)
+    graph.prev, operations = _astar_csr(indptr, neighbors, weights, heuristic, dist, start.index,
+                                        end.index if end is not None else -1)
+    # Same as the Dijkstra result whatever the kernel used: float64, inf for the unreached vertices
+    graph.dist = np.where(dist == INT_INF, np.inf, dist) if dist.dtype.kind == 'i' else dist
     
     print(operations)
 
 if __name__ == '__main__':
+    # The first call compiles _astar_csr with numba (or loads it from the cache), keep that out of the timing.
+    warm_up = load_from_file('data.txt')
+    load_heuristic_data(warm_up, 'heuristics.txt')
+    with contextlib.redirect_stdout(io.StringIO()):
+        a_star_algorithm(warm_up, warm_up.get_vertex('A'), warm_up.get_vertex('J'))
+    
     graph1 = load_from_file('data.txt')
     load_heuristic_data(graph1, 'heuristics.txt')
     start = tm.perf_counter()
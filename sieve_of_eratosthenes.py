@@ -1,6 +1,17 @@
 import numpy as np
 import time as tm
 
+# Residues modulo 30 that are coprime to 30, and the position of each one of them in the wheel.
+WHEEL : tuple[int, ...] = (1, 7, 11, 13, 17, 19, 23, 29)
+WHEEL_ARRAY : np.ndarray = np.array(WHEEL)
+WHEEL_POSITION : dict[int, int] = {r: i for i, r in enumerate(WHEEL)}
+
+def _wheel_value(k : int) -> int:
+    return 30 * (k // 8) + WHEEL[k % 8]
+
+def _wheel_index(value : int) -> int:
+    return value // 30 * 8 + WHEEL_POSITION[value % 30]
+
 def sieve_of_eratosthenes(n : int) -> list[int]:
     """ Find all prime numbers between 2 and a number n
     Intended to be O(n*log(log n))
@@ -12,16 +23,33 @@ def sieve_of_eratosthenes(n : int) -> list[int]:
     Returns:
         list: prime numbers between 2 and n
     """
-    consecutive_numbers : list[bool] = [True for _ in range(n)]
-    for i in range(2, int(np.sqrt(n) + 1)):
-        if consecutive_numbers[i]:
-            for j in range(i*i, n, i):
-                consecutive_numbers[j] = False
+    # Wheel factorization: only numbers coprime to 2*3*5 = 30 are stored, 8 of every 30 integers.
+    # Index k represents 30 * (k // 8) + WHEEL[k % 8].
+    small_primes : list[int] = [p for p in (2, 3, 5) if p < n]
+    if n <= 7:
+        return small_primes
+    
+    is_prime : np.ndarray = np.ones((n + 29) // 30 * 8, dtype=bool)
+    is_prime[0] = False
+    k : int = 1
+    while _wheel_value(k) ** 2 < n:
+        if is_prime[k]:
+            p = _wheel_value(k)
+            # Multiples p*m that are left on the wheel are the ones with m coprime to 30. For each of the
+            # 8 residues of m, they sit in the same residue of p*m, one every 8p positions in the array.
+            for r in WHEEL:
+                m = p + (r - p) % 30
+                is_prime[_wheel_index(p * m)::8 * p] = False
+        k += 1
     
-    return [idx for idx, val in enumerate(consecutive_numbers) if val and idx >= 2]
+    # 4 bytes per index instead of 8 whenever the numbers fit in 32 bits
+    numbers : np.ndarray = np.flatnonzero(is_prime).astype(np.uint32 if n + 30 < 2**32 else np.uint64)
+    numbers = 30 * (numbers // 8) + WHEEL_ARRAY.astype(numbers.dtype)[numbers % 8]
+    return small_primes + numbers[numbers < n].tolist()
 
-n : int = int(input('N: '))
-start : int = tm.perf_counter_ns()
-primes : list[int] = sieve_of_eratosthenes(n)
-end : int = tm.perf_counter_ns()
-print(f"{primes} \nSize: {len(primes)} \nTime elapsed: {end - start}ns")
+if __name__ == '__main__':
+    n : int = int(input('N: '))
+    start : int = tm.perf_counter_ns()
+    primes : list[int] = sieve_of_eratosthenes(n)
+    end : int = tm.perf_counter_ns()
+    print(f"{primes} \nSize: {len(primes)} \nTime elapsed: {end - start}ns")
@@ -0,0 +1,205 @@
+import heapq
+import os
+import random
+import numpy as np
+import pytest
+from A_star import (build_graph_from_list, load_from_file, load_heuristic_data, get_path, heuristic_values,
+                    a_star_algorithm, dijkstras_algorithm)
+from utils.graph import Location
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def random_edges(seed : int, vertices : int, edges : int, weight=lambda rng: rng.randint(1, 20)) -> list[tuple]:
+    rng = random.Random(seed)
+    return [(rng.randrange(vertices), rng.randrange(vertices), weight(rng)) for _ in range(edges)]
+
+def reference_dist(edges : list[tuple], start) -> dict:
+    adjacency = {}
+    for v_1, v_2, weight in edges:
+        # add_edge keeps the last weight given to an edge
+        adjacency.setdefault(v_1, {})[v_2] = weight
+    dist = {start: 0}
+    heap = [(0, start)]
+    while heap:
+        d, v = heapq.heappop(heap)
+        if d > dist[v]:
+            continue
+        for w, weight in adjacency.get(v, {}).items():
+            if d + weight < dist.get(w, np.inf):
+                dist[w] = d + weight
+                heapq.heappush(heap, (d + weight, w))
+    return dist
+
+def path_cost(edges : list[tuple], path : list) -> float:
+    weights = {(v_1, v_2): weight for v_1, v_2, weight in edges}
+    return sum(weights[edge] for edge in zip(path, path[1:]))
+
+def check_search(search, edges : list[tuple], heuristic=lambda v: 0) -> None:
+    # Full search from the first vertex against the reference distances
+    start = edges[0][0]
+    expected = reference_dist(edges, start)
+    graph = build_graph_from_list(edges)
+    for v in graph:
+        v.heuristic = heuristic(v)
+    search(graph, graph.get_vertex(start), None)
+    for v in graph:
+        if v.key in expected:
+            assert graph.dist[v.index] == expected[v.key]
+            path = get_path(graph, v.key)
+            assert path[0] == start and path[-1] == v.key
+            assert path_cost(edges, path) == expected[v.key]
+        else:
+            assert graph.prev[v.index] == -1
+
+def check_search_to(search, edges : list[tuple]) -> None:
+    # Search that stops at the farthest reachable vertex
+    expected = reference_dist(edges, edges[0][0])
+    end = max(expected, key=expected.get)
+    graph = build_graph_from_list(edges)
+    for v in graph:
+        v.heuristic = 0
+    search(graph, graph.get_vertex(edges[0][0]), graph.get_vertex(end))
+    assert path_cost(edges, get_path(graph, end)) == expected[end]
+
+def test_freeze_csr():
+    edges = random_edges(0, 50, 300)
+    graph = build_graph_from_list(edges)
+    indptr, neighbors, weights = graph.freeze()
+    vertices = list(graph)
+    # Iteration follows Vertex.index, and indices go by decreasing degree
+    assert [v.index for v in vertices] == list(range(graph.total_vert))
+    degrees = np.diff(indptr)
+    assert np.all(degrees[:-1] >= degrees[1:])
+    assert graph.keys.tolist() == [v.key for v in vertices]
+    for v in vertices:
+        lo, hi = indptr[v.index], indptr[v.index + 1]
+        assert {vertices[n].key: w for n, w in zip(neighbors[lo:hi].tolist(), weights[lo:hi].tolist())} == \
+               {n.key: w for n, w in v.connected_to.items()}
+    # Cached until the graph changes
+    assert graph.freeze() is graph.freeze()
+    graph.add_edge(0, 49, 1)
+    assert graph._csr is None
+
+def test_get_path_before_search():
+    graph = build_graph_from_list([('A', 'B', 1)])
+    assert get_path(graph, 'B') == ['B']
+
+def test_get_path_after_modification():
+    for search in (a_star_algorithm, dijkstras_algorithm):
+        graph = build_graph_from_list([('A', 'B', 1), ('B', 'C', 1), ('C', 'D', 1)])
+        for v in graph:
+            v.heuristic = 0
+        search(graph, graph.get_vertex('A'), None)
+        assert get_path(graph, 'D') == ['A', 'B', 'C', 'D']
+        # The next freeze() renumbers the vertices, the old results no longer apply
+        for _ in range(3):
+            graph.add_edge('D', 'E', 1)
+        assert graph.dist is None and graph.prev is None
+        assert get_path(graph, 'D') == ['D']
+        assert get_path(graph, 'E') == ['E']
+
+def test_dijkstra_matches_reference():
+    check_search(dijkstras_algorithm, random_edges(1, 60, 400))
+    check_search(dijkstras_algorithm, random_edges(2, 60, 400, weight=lambda rng: rng.uniform(0.5, 10.0)))
+    check_search(dijkstras_algorithm, random_edges(3, 30, 20))
+    check_search_to(dijkstras_algorithm, random_edges(4, 40, 200))
+
+def test_load_from_file(tmp_path):
+    data = tmp_path / 'data.txt'
+    data.write_text('C#,B,3\nB,D,4\n')
+    graph = load_from_file(str(data))
+    assert sorted(graph.keys.tolist()) == ['B', 'C#', 'D']
+    dijkstras_algorithm(graph, graph.get_vertex('C#'), graph.get_vertex('D'))
+    assert get_path(graph, 'D') == ['C#', 'B', 'D']
+    empty = tmp_path / 'empty.txt'
+    empty.write_text('')
+    assert load_from_file(str(empty)).total_vert == 0
+
+def test_unreached_distance():
+    # 'C' is a key with no path from 'A'
+    for search in (a_star_algorithm, dijkstras_algorithm):
+        graph = build_graph_from_list([('A', 'B', 2), ('C', 'A', 1)])
+        search(graph, graph.get_vertex('A'), None)
+        assert graph.dist.dtype == np.float64
+        assert np.isinf(graph.dist).tolist() == [v.key == 'C' for v in graph]
+
+def test_large_weights():
+    # Past int32, and paths costing more than INT_INF
+    edges = [(0, 1, 3_000_000_000), (1, 2, 3_000_000_000), (0, 3, 1_500_000_000), (3, 4, 1_500_000_000)]
+    for search in (a_star_algorithm, dijkstras_algorithm):
+        check_search(search, edges)
+
+def test_a_star_matches_reference():
+    check_search(a_star_algorithm, random_edges(1, 60, 400))
+    check_search(a_star_algorithm, random_edges(2, 60, 400, weight=lambda rng: rng.uniform(0.5, 10.0)))
+    check_search(a_star_algorithm, random_edges(3, 30, 20))
+    check_search_to(a_star_algorithm, random_edges(4, 40, 200))
+
+def test_a_star_inconsistent_heuristic():
+    # U is first reached through S-U at 10, then expanded again at 2 through A. Every T is pushed on both
+    # expansions, more entries than there are edges.
+    edges = [('S', 'U', 10), ('S', 'A', 1), ('A', 'U', 1)] + [('U', f'T{i}', 1) for i in range(50)]
+    heuristic = lambda v: 100 if v.key == 'A' else 1000 if v.key.startswith('T') else 0
+    check_search(a_star_algorithm, edges, heuristic)
+    graph = build_graph_from_list(edges)
+    for v in graph:
+        v.heuristic = heuristic(v)
+    a_star_algorithm(graph, graph.get_vertex('S'), None)
+    assert get_path(graph, 'T7') == ['S', 'A', 'U', 'T7']
+
+def test_a_star_precalculated_heuristic():
+    # Exact distance to the end, taken from the reference on the reversed edges
+    edges = random_edges(5, 40, 200)
+    start = edges[0][0]
+    end = max(reference_dist(edges, start).items(), key=lambda item: item[1])[0]
+    to_end = reference_dist([(v_2, v_1, weight) for v_1, v_2, weight in edges], end)
+    graph = build_graph_from_list(edges)
+    for v in graph:
+        v.heuristic = to_end.get(v.key, 1000)
+    a_star_algorithm(graph, graph.get_vertex(start), graph.get_vertex(end))
+    assert path_cost(edges, get_path(graph, end)) == reference_dist(edges, start)[end]
+
+def test_a_star_heuristic_file():
+    paths = []
+    for search in (a_star_algorithm, dijkstras_algorithm):
+        graph = load_from_file(os.path.join(ROOT, 'data.txt'))
+        load_heuristic_data(graph, os.path.join(ROOT, 'heuristics.txt'))
+        search(graph, graph.get_vertex('A'), graph.get_vertex('J'))
+        paths.append(get_path(graph, 'J'))
+    assert paths[0] == paths[1]
+
+def grid(size : int) -> tuple[list[tuple], dict]:
+    # Weights are at least the Manhattan distance between the endpoints, so the heuristic is admissible
+    rng = random.Random(6)
+    edges = []
+    for x in range(size):
+        for y in range(size):
+            for nx, ny in ((x + 1, y), (x, y + 1), (x - 1, y), (x, y - 1)):
+                if 0 <= nx < size and 0 <= ny < size:
+                    edges.append(((x, y), (nx, ny), 1 + rng.randint(0, 3)))
+    return edges, {(x, y): Location(x, y) for x in range(size) for y in range(size)}
+
+def test_a_star_manhattan_heuristic():
+    edges, locations = grid(8)
+    graph = build_graph_from_list(edges)
+    for v in graph:
+        v.location = locations[v.key]
+    end = graph.get_vertex((7, 5))
+    heuristic = heuristic_values(graph, end)
+    x, y = graph.locations()
+    assert heuristic.tolist() == (np.abs(x - 7) + np.abs(y - 5)).tolist()
+    a_star_algorithm(graph, graph.get_vertex((0, 0)), end)
+    assert path_cost(edges, get_path(graph, (7, 5))) == reference_dist(edges, (0, 0))[(7, 5)]
+
+def test_heuristic_needs_every_location():
+    edges, locations = grid(3)
+    graph = build_graph_from_list(edges)
+    for v in graph:
+        if v.key != (1, 1):
+            v.location = locations[v.key]
+    with pytest.raises(ValueError, match='location'):
+        heuristic_values(graph, graph.get_vertex((2, 2)))
+    # Pre-calculated heuristics take precedence over the locations
+    for v in graph:
+        v.heuristic = 1
+    assert heuristic_values(graph, graph.get_vertex((2, 2))).tolist() == [1] * graph.total_vert
@@ -0,0 +1,47 @@
+import random
+import numpy as np
+from utils.priority_queue import PriorityQueue
+from A_star import _heap_push, _heap_pop
+
+def drain(prio : PriorityQueue) -> list[int]:
+    nodes = []
+    while not prio.empty():
+        nodes.append(prio.advance())
+    return nodes
+
+def test_insert_order():
+    rng = random.Random(0)
+    items = [(rng.randint(0, 50), node) for node in range(200)]
+    for descending in (True, False):
+        prio = PriorityQueue(descending=descending)
+        for item in items:
+            prio.insert(item)
+        keys = dict((node, key) for key, node in items)
+        order = [keys[node] for node in drain(prio)]
+        assert order == sorted(order, reverse=descending)
+        assert len(order) == len(items)
+
+def test_build_heap_order():
+    rng = random.Random(1)
+    items = [(rng.random(), node) for node in range(101)]
+    for descending in (True, False):
+        prio = PriorityQueue(descending=descending)
+        prio.build_heap(items)
+        expected = [node for _, node in sorted(items, reverse=descending)]
+        assert drain(prio) == expected
+
+def test_compiled_heap_order():
+    rng = np.random.default_rng(2)
+    keys = rng.integers(0, 1000, size=300).astype(np.float64)
+    # Starts with room for a single entry, so pushing has to grow the arrays
+    heap_key = np.empty(1)
+    heap_node = np.empty(1, dtype=np.int32)
+    size = 0
+    for node, key in enumerate(keys):
+        heap_key, heap_node, size = _heap_push(heap_key, heap_node, size, key, node)
+    popped = []
+    while size > 0:
+        key, node, size = _heap_pop(heap_key, heap_node, size)
+        assert keys[node] == key
+        popped.append(key)
+    assert popped == sorted(keys.tolist())
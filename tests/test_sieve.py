@@ -0,0 +1,19 @@
+from sieve_of_eratosthenes import sieve_of_eratosthenes
+
+def plain_sieve(n : int) -> list[int]:
+    is_prime = [True] * max(n, 2)
+    is_prime[0] = is_prime[1] = False
+    for i in range(2, int(n ** 0.5) + 1):
+        if is_prime[i]:
+            is_prime[i * i::i] = [False] * len(is_prime[i * i::i])
+    return [i for i in range(n) if is_prime[i]]
+
+def test_matches_plain_sieve():
+    # Small n go through the early return, the rest cover every residue of the wheel around the limit
+    for n in range(0, 2000):
+        assert sieve_of_eratosthenes(n) == plain_sieve(n), n
+
+def test_large_limit():
+    primes = sieve_of_eratosthenes(1_000_000)
+    assert len(primes) == 78498
+    assert primes[-1] == 999983
@@ -1,11 +1,14 @@
 from __future__ import annotations
 from typing import Any
+import numpy as np
 # Uncomment if you have pyvis
 #from pyvis.network import Network
 
 class Location:
     """Change this as whatever you want.
     """
+    __slots__ = ('_x', '_y')
+    
     def __init__(self, x : float|int = 0, y : float|int = 0) -> None:
         self._x = x
         self._y = y
@@ -36,11 +39,14 @@ class Vertex:
     """
     Represents each vertex on the graph, it uses a dictionary to connect each one of them.
     """
-    def __init__(self, key : Any) -> None:
+    __slots__ = ('_id', '_index', 'connected_to', '_location', '_heuristic')
+    
+    def __init__(self, key : Any, index : int = 0) -> None:
         self._id : Any = key
+        # Position of the vertex inside the graph, used to address the CSR arrays.
+        self._index : int = index
         self.connected_to : dict[Any, int] = {}
-        self._dist : int = 0
-        self._predecessor : Vertex = None
+        # Distance and predecessor are not stored here, searches keep them in Graph.dist and Graph.prev.
         # This can be changed to everything, used to calculate the heuristic value between 2 vertices.
         # I.E. lets say you're trying to find the best route between two cities, then your geo position would be
         # the coordinates of that city, and to calculate the heuristic you could use the distance between them.
@@ -87,20 +93,8 @@ class Vertex:
         return self._id
     
     @property
-    def dist(self) -> int:
-        return self._dist
-    
-    @dist.setter
-    def dist(self, new_dist: int) -> None:
-        self._dist = new_dist
-        
-    @property
-    def predecessor(self) -> Vertex:
-        return self._predecessor
-    
-    @predecessor.setter
-    def predecessor(self, new_predecessor) -> None:
-        self._predecessor = new_predecessor
+    def index(self) -> int:
+        return self._index
     
     @property
     def location(self) -> Location:
@@ -135,10 +129,23 @@ class Vertex:
         """
         return self.connected_to[neighbor]
     
+# Distance of the vertices not reached by the A* kernel when it works with int32 distances.
+# int32 distances are only used when every possible path cost (plus heuristic) stays below it.
+INT_INF : int = np.iinfo(np.int32).max // 2
+
 class Graph:
     def __init__(self) -> None:
         self.vertex_list : dict[Any, Vertex] = {}
         self.total_vert : int = 0
+        # Result of the last search, indexed by Vertex.index: distance from the start (float64, inf for unreached
+        # vertices) and index of the predecessor (-1 if there is none). Dropped whenever the graph is modified,
+        # since the next freeze() renumbers the vertices.
+        self.dist : np.ndarray = None
+        self.prev : np.ndarray = None
+        # CSR arrays and key of each vertex index, built by freeze() and dropped whenever the graph is modified.
+        self._csr : tuple[np.ndarray, np.ndarray, np.ndarray] = None
+        self._csr_lists : tuple[list, list, list] = None
+        self._keys : np.ndarray = None
     
     def add_vertex(self, key : Any) -> Vertex:
         """
@@ -155,8 +162,9 @@ class Graph:
             Vertex added.
 
         """
+        self._modified()
+        new_vertex = Vertex(key, self.total_vert)
         self.total_vert += 1
-        new_vertex = Vertex(key)
         self.vertex_list[key] = new_vertex
         return new_vertex
     
@@ -206,13 +214,126 @@ class Graph:
             self.add_vertex(ffrom)
         if to not in self.vertex_list:
             self.add_vertex(to)
+        self._modified()
         self.vertex_list[ffrom].add_neighbor(self.vertex_list[to], weight)
         
+    def _modified(self) -> None:
+        """
+        Drops everything derived from the current vertices and edges: the CSR arrays and the results of the
+        last search.
+        """
+        self._csr = None
+        self._csr_lists = None
+        self.dist = None
+        self.prev = None
+    
     def get_vertex_keys(self):
         return self.vertex_list.keys()
     
     def __iter__(self):
         return iter(self.vertex_list.values())
+    
+    def freeze(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Packs the edges in Compressed Sparse Row arrays. The neighbors of the vertex with index i are
+        neighbors[indptr[i]:indptr[i + 1]] and the weights of those edges are at the same positions in weights.
+        The arrays are built once and reused until the graph is modified through add_vertex or add_edge.
+        Vertices are renumbered by decreasing degree first, so the most visited vertices sit next to each other
+        in every array indexed by Vertex.index.
+
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray, np.ndarray]
+            indptr (int32[V + 1]), neighbors (int32[E]) and weights (int32[E] if every weight is an integer
+            that fits in an int32, int64[E] for larger integers, float64[E] otherwise).
+
+        """
+        if self._csr is not None:
+            return self._csr
+        
+        degrees = np.fromiter((len(v.connected_to) for v in self), dtype=np.int32, count=self.total_vert)
+        order = np.argsort(-degrees, kind='stable')
+        self._assign_ids(order)
+        
+        indptr = np.zeros(self.total_vert + 1, dtype=np.int32)
+        indptr[1:] = np.cumsum(degrees[order])
+        
+        neighbors = np.empty(indptr[-1], dtype=np.int32)
+        for v in self:
+            neighbors[indptr[v.index]:indptr[v.index + 1]] = [neighbor.index for neighbor in v.connected_to]
+        # Integer weights are kept as int32 when they fit, half the bytes of a float64 per edge.
+        weights = np.array([weight for v in self for weight in v.connected_to.values()])
+        if weights.dtype.kind in 'iu':
+            int32 = np.iinfo(np.int32)
+            fits = weights.size == 0 or (int32.min <= weights.min() and weights.max() <= int32.max)
+            weights = weights.astype(np.int32 if fits else np.int64)
+        else:
+            weights = weights.astype(np.float64)
+        
+        self._csr = (indptr, neighbors, weights)
+        self._csr_lists = None
+        self._keys = np.empty(self.total_vert, dtype=object)
+        self._keys[:] = list(self.vertex_list)
+        return self._csr
+    
+    def _assign_ids(self, order : np.ndarray) -> None:
+        """
+        Renumbers the vertices, the vertex currently at index order[i] gets index i.
+        vertex_list is rebuilt in the new order, so iterating the graph always follows Vertex.index.
+        Results of previous searches are dropped since they use the old indices.
+
+        Parameters
+        ----------
+        order : np.ndarray
+            Permutation of the current vertex indices.
+
+        Returns
+        -------
+        None
+
+        """
+        vertices = list(self)
+        reordered = [vertices[i] for i in order.tolist()]
+        for idx, v in enumerate(reordered):
+            v._index = idx
+        self.vertex_list = {v.key: v for v in reordered}
+        self.dist = None
+        self.prev = None
+    
+    def freeze_lists(self) -> tuple[list, list, list]:
+        """
+        Same arrays as freeze() converted to plain lists, which are faster to index one element at a time from
+        Python. They are cached along with the arrays.
+
+        Returns
+        -------
+        tuple[list, list, list]
+            indptr, neighbors and weights.
+
+        """
+        csr = self.freeze()
+        if self._csr_lists is None:
+            self._csr_lists = tuple(arr.tolist() for arr in csr)
+        return self._csr_lists
+    
+    @property
+    def keys(self) -> np.ndarray:
+        self.freeze()
+        return self._keys
+    
+    def locations(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Coordinates of every vertex, indexed by Vertex.index.
+
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray]
+            x (float64[V]) and y (float64[V]).
+
+        """
+        x = np.fromiter((v.location.x for v in self), dtype=np.float64, count=self.total_vert)
+        y = np.fromiter((v.location.y for v in self), dtype=np.float64, count=self.total_vert)
+        return x, y
 
 ##########
 # We could use pyvis for visualization. Uncomment the code below if you have pyvis installed.
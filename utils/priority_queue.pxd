@@ -0,0 +1,15 @@
+cimport cython
+from cpython.array cimport array
+
+cdef class PriorityQueue:
+    cdef array __keys
+    cdef array __nodes
+    cdef bint __descending
+
+    cpdef bint empty(self)
+    @cython.locals(keys="double[:]", nodes="long[:]", desc=bint, parent=Py_ssize_t)
+    cpdef void percolate_up(self, Py_ssize_t pos)
+    cpdef void insert(self, tuple item)
+    @cython.locals(keys="double[:]", nodes="long[:]", size=Py_ssize_t, desc=bint, child=Py_ssize_t)
+    cpdef void percolate_down(self, Py_ssize_t pos)
+    cpdef long advance(self)
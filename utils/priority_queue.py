@@ -1,5 +1,12 @@
+# cython: annotation_typing=False
 from __future__ import annotations
 from typing import Any
+from array import array
+
+# This module runs as plain Python, but it can also be compiled with Cython: priority_queue.pxd turns the classes into
+# extension types with typed attributes and loop variables. Build it in place with
+#   cythonize -i -3 utils/priority_queue.py
+# (annotation_typing is off so that the C types come from the .pxd and not from the Python annotations).
 
 #########
 # From: Problem Solving with Algorithms and Data Structures using Python
@@ -7,45 +14,39 @@ from typing import Any
 #       Modified to work with Dijkstra's Algorithm
 
 class PriorityQueue:
+    __slots__ = ('__keys', '__nodes', '__descending')
+    
     # Constructor
     def __init__(self, descending : bool = True) -> None:
-        """PriorityQueue
+        """PriorityQueue of integer nodes (e.g. vertex indices) with float keys.
+        The heap is 0-indexed: children of i are 2i + 1 and 2i + 2. Keys and nodes are kept in two parallel
+        primitive arrays instead of a list of tuples.
 
         Args:
             descending (bool, optional): Maximum value is always removed first, set to False otherwise. Defaults to True.
         """
-        self.__internal_list : list[tuple] = [(0, 0)]
-        self.__size : int = 0
+        self.__keys : array = array('d')
+        self.__nodes : array = array('l')
         self.__descending : bool = descending
         
     @property
     def size(self) -> int:
-        return self.__size
+        return len(self.__keys)
     
     def empty(self) -> bool:
-        return self.__size == 0
+        return len(self.__keys) == 0
     
     def __str__(self) -> str:
-        res = ''
-        for idx, item in enumerate(self.__internal_list):
-            if idx == 0:
-                continue
-            res += str(item[0]) + ' ' + str(item[1])
-            if idx + 1 <= self.size:
-                res += '\n'
-        return res
+        return '\n'.join(str(key) + ' ' + str(node) for key, node in self)
     
     def __iter__(self):
-        return iter(self.__internal_list[1:])
+        return zip(self.__keys, self.__nodes)
     
     def __len__(self):
         return self.size
     
-    def __contains__(self, val: Any):
-        for par in self.__internal_list:
-            if par[1] == val:
-                return True
-        return False
+    def __contains__(self, val: int):
+        return val in self.__nodes
     
     def percolate_up(self, pos: int) -> None:
         """
@@ -60,39 +61,37 @@ class PriorityQueue:
         -------
         None
         """
-        if pos // 2 == 0:
-            return
-        
-        if self.__descending:
-            if self.__internal_list[pos][0] > self.__internal_list[pos // 2][0]:
-                aux = self.__internal_list[pos // 2]
-                self.__internal_list[pos // 2] = self.__internal_list[pos]
-                self.__internal_list[pos] = aux
-        else:
-            if self.__internal_list[pos][0] < self.__internal_list[pos // 2][0]:
-                aux = self.__internal_list[pos // 2]
-                self.__internal_list[pos // 2] = self.__internal_list[pos]
-                self.__internal_list[pos] = aux
-            
-        self.percolate_up(pos // 2)
+        keys = self.__keys
+        nodes = self.__nodes
+        desc = self.__descending
+        while pos > 0:
+            parent = (pos - 1) // 2
+            if desc:
+                if keys[pos] <= keys[parent]:
+                    return
+            elif keys[pos] >= keys[parent]:
+                return
+            keys[pos], keys[parent] = keys[parent], keys[pos]
+            nodes[pos], nodes[parent] = nodes[parent], nodes[pos]
+            pos = parent
     
-    def insert(self, item: Any) -> None:
+    def insert(self, item: tuple) -> None:
         """
         Inserts a new element to the priority queue, maintaining the heap order property
 
         Parameters
         ----------
-        item : Any
-            Element to insert.
+        item : tuple
+            (key, node) to insert.
 
         Returns
         -------
         None
         """
-        self.__internal_list.append(item)
-        self.__size += 1
+        self.__keys.append(item[0])
+        self.__nodes.append(item[1])
         # Percolate the added element if needed.
-        self.percolate_up(self.size)
+        self.percolate_up(len(self.__keys) - 1)
     
     def min_max_child(self, pos: int) -> int:
         """
@@ -108,14 +107,15 @@ class PriorityQueue:
         int
             Position of the minimum or maximum children.
         """
+        keys = self.__keys
+        child = pos * 2 + 1
         # Right child
-        if pos * 2 + 1 > self.__size:
-            return pos * 2
+        if child + 1 >= len(keys):
+            return child
+        if self.__descending:
+            return child if keys[child] > keys[child + 1] else child + 1
         else:
-            if self.__descending:
-                return pos * 2 if self.__internal_list[pos * 2][0] > self.__internal_list[pos * 2 + 1][0] else pos * 2 + 1
-            else:
-                return pos * 2 if self.__internal_list[pos * 2][0] < self.__internal_list[pos * 2 + 1][0] else pos * 2 + 1
+            return child if keys[child] < keys[child + 1] else child + 1
 
     def percolate_down(self, pos: int) -> None:
         """
@@ -130,38 +130,44 @@ class PriorityQueue:
         -------
         None
         """
-        if 2 * pos > self.__size:
-            return
-
-        # Look for the maximum or minimum child
-        min_max_child = self.min_max_child(pos)
-        if self.__descending:
-            if self.__internal_list[pos][0] < self.__internal_list[min_max_child][0]:
-                aux = self.__internal_list[pos]
-                self.__internal_list[pos] = self.__internal_list[min_max_child]
-                self.__internal_list[min_max_child] = aux
-        else:
-            if self.__internal_list[pos][0] > self.__internal_list[min_max_child][0]:
-                aux = self.__internal_list[pos]
-                self.__internal_list[pos] = self.__internal_list[min_max_child]
-                self.__internal_list[min_max_child] = aux
-        
-        self.percolate_down(min_max_child)
+        keys = self.__keys
+        nodes = self.__nodes
+        size = len(keys)
+        desc = self.__descending
+        while 2 * pos + 1 < size:
+            # Look for the maximum or minimum child (same as min_max_child, inlined)
+            child = pos * 2 + 1
+            if child + 1 < size:
+                if desc:
+                    if keys[child + 1] >= keys[child]:
+                        child += 1
+                elif keys[child + 1] <= keys[child]:
+                    child += 1
+            if desc:
+                if keys[pos] >= keys[child]:
+                    return
+            elif keys[pos] <= keys[child]:
+                return
+            keys[pos], keys[child] = keys[child], keys[pos]
+            nodes[pos], nodes[child] = nodes[child], nodes[pos]
+            pos = child
         
-    def advance(self) -> Any:
+    def advance(self) -> int:
         """
         Deletes the first element of the priority queue
 
         Returns
         -------
-        Any
-            Deleted element.
+        int
+            Deleted node.
         """
-        deleted = self.__internal_list[1][1]
-        self.__internal_list[1] = self.__internal_list[self.__size]
-        self.__size -= 1
-        self.__internal_list.pop()
-        self.percolate_down(1)
+        deleted = self.__nodes[0]
+        last_key = self.__keys.pop()
+        last_node = self.__nodes.pop()
+        if len(self.__keys) > 0:
+            self.__keys[0] = last_key
+            self.__nodes[0] = last_node
+            self.percolate_down(0)
         
         return deleted
     
@@ -172,47 +178,18 @@ class PriorityQueue:
         Parameters
         ----------
         from_list : list
+            List of (key, node) tuples.
 
         Returns
         -------
         None
         """
-        i = len(from_list) // 2
-        self.__size = len(from_list)
-        self.__internal_list = [(0, 0)] + from_list[:]
-        while (i > 0):
+        self.__keys = array('d', [key for key, _ in from_list])
+        self.__nodes = array('l', [node for _, node in from_list])
+        i = len(from_list) // 2 - 1
+        while (i >= 0):
             self.percolate_down(i)
             i -= 1
-            
-    def find_position(self, to_find: Any) -> int:
-        pos = None
-        i = 1
-        while i <= self.size:
-            if self.__internal_list[i][1] == to_find:
-                pos = i
-                break
-            i += 1
-        
-        return pos
-            
-    def decrease_key(self, value: Any, new_val: int) -> None:
-        pos = self.find_position(value)
-        if not pos:
-            return
-        
-        old_key = self.__internal_list[pos][0]
-        self.__internal_list[pos] = (new_val, self.__internal_list[pos][1])
-        
-        if self.__descending:
-            if old_key < new_val:
-                self.percolate_up(pos)
-            else:
-                self.percolate_down(pos)
-        else:
-            if old_key < new_val:
-                self.percolate_down(pos)
-            else:
-                self.percolate_up(pos)
     
 if __name__ == '__main__':
     prio = PriorityQueue(descending=True)
@@ -221,7 +198,6 @@ if __name__ == '__main__':
     #     rand = (random.randint(1,10), 8)
     #     prio.insert(rand)
     prio.build_heap(build_list)
-    prio.decrease_key(5, 99)
     print(prio)
     
     deleted_list = []